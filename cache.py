@@ -0,0 +1,101 @@
+# cache.py
+# Persistent on-disk cache of analysis results, keyed by a hash of the source.
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Bump whenever rules/estimator output changes so stale entries are ignored.
+CACHE_VERSION = 5
+
+CACHE_DIR = Path.home() / ".cache" / "digital-waste-analyzer"
+# entries hold the analyzed source (the `patched` field), so keep them bounded
+# both in number and in how long they stay on disk
+CACHE_MAX_ENTRIES = 512
+CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+# pruning scans the whole directory, so run it on the first write and then
+# only every _PRUNE_EVERY writes (so up to that many entries over the cap);
+# load() enforces the age limit on its own
+_PRUNE_EVERY = 64
+_writes_since_prune = _PRUNE_EVERY
+
+_MAGIC = b"dwa"
+_HEADER = _MAGIC + CACHE_VERSION.to_bytes(2, "big")
+
+
+def key_for(source: str) -> str:
+    return hashlib.blake2b(source.encode("utf-8")).hexdigest()
+
+
+def _path_for(hashkey: str) -> Path:
+    return CACHE_DIR / f"{hashkey}.bin"
+
+
+def load(hashkey: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached result for `hashkey`, or None on a miss. Entries from
+    another cache version, older than CACHE_MAX_AGE or that fail to decode are
+    treated as misses.
+    """
+    try:
+        with open(_path_for(hashkey), "rb") as fh:
+            if time.time() - os.fstat(fh.fileno()).st_mtime > CACHE_MAX_AGE:
+                return None
+            data = fh.read()
+    except OSError:
+        return None
+    if not data.startswith(_HEADER):
+        return None
+    try:
+        return pickle.loads(zlib.decompress(data[len(_HEADER):]))
+    except Exception:
+        return None
+
+
+def store(hashkey: str, result: Dict[str, Any]) -> None:
+    """
+    Write `result` for `hashkey`. The write goes through a temporary file and
+    os.replace so readers never see a partial entry. Old entries are pruned
+    every _PRUNE_EVERY writes (see _prune). Failures (read-only home, full
+    disk) are ignored; the cache is only an optimization.
+    """
+    global _writes_since_prune
+    data = _HEADER + zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, _path_for(hashkey))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        _writes_since_prune += 1
+        if _writes_since_prune >= _PRUNE_EVERY:
+            _writes_since_prune = 0
+            _prune()
+    except OSError:
+        pass
+
+
+def _prune() -> None:
+    # drop entries past CACHE_MAX_AGE, then the oldest ones beyond CACHE_MAX_ENTRIES
+    entries = []
+    for path in CACHE_DIR.glob("*.bin"):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except OSError:
+            pass
+    entries.sort(reverse=True)
+    cutoff = time.time() - CACHE_MAX_AGE
+    for i, (mtime, path) in enumerate(entries):
+        if i >= CACHE_MAX_ENTRIES or mtime < cutoff:
+            try:
+                path.unlink()
+            except OSError:
+                pass
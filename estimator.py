@@ -1,48 +1,65 @@
 # estimator.py
 # Heuristic estimator for runtime and complexity based on AST findings.
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
+
+import numpy as np
 
 # Default assumptions (configurable)
 DEFAULT_LIST_SIZE = 100   # assumed size when unknown
 BASE_OP_COST = 1e-6       # seconds per simple operation (very small baseline)
 
 
+# heuristic impact per rule id in seconds (very approximate), before severity weighting
+_IMPACT = {
+    "R001": BASE_OP_COST * (DEFAULT_LIST_SIZE ** 2),  # nested loops -> O(n^2)
+    "R002": BASE_OP_COST * DEFAULT_LIST_SIZE * 10.0,  # expensive call in loop
+    "R003": BASE_OP_COST * DEFAULT_LIST_SIZE * 2.0,   # membership-in-list
+    "R004": BASE_OP_COST * DEFAULT_LIST_SIZE * 1.5,   # string concat in loop
+    "R005": 0.0005 * DEFAULT_LIST_SIZE,               # file I/O in loop, ~0.0005s per op
+    "R006": 0.00001,                                  # unused imports
+}
+_DEFAULT_IMPACT = BASE_OP_COST * DEFAULT_LIST_SIZE
+
+# severity weight to scale impact
+_WEIGHT = {"low": 0.5, "medium": 1.0, "high": 2.0}
+
+# complexity points per severity
+_POINTS = {"low": 3.0, "medium": 8.0, "high": 18.0}
+
+# Lookup tables for the vectorized paths. Findings are mapped to ordinals and
+# unknown ids map to -1, i.e. the trailing default entry of each table.
+_RID_TO_IDX = {rid: i for i, rid in enumerate(_IMPACT)}
+_SEV_TO_IDX = {sev: i for i, sev in enumerate(_WEIGHT)}
+_IMPACT_TABLE = np.array(list(_IMPACT.values()) + [_DEFAULT_IMPACT], dtype=np.float64)
+_WEIGHT_TABLE = np.array(list(_WEIGHT.values()) + [1.0], dtype=np.float64)
+_POINTS_TABLE = np.array([_POINTS[sev] for sev in _WEIGHT] + [0.0], dtype=np.float64)
+
+
+def _ordinals(values: Sequence[Any], index: Dict[str, int]) -> np.ndarray:
+    get = index.get
+    return np.fromiter((get(v, -1) for v in values), dtype=np.intp, count=len(values))
+
+
 def estimate_block_runtime(findings: List[Dict[str, Any]]) -> float:
     """
     Given rule findings (from rules.get_findings), produce an estimated runtime (seconds)
     for a single run of the script using simple heuristics.
     Returns estimated seconds.
     """
-    sec = 0.0
+    return estimate_block_runtime_columns([f.get("rule_id") for f in findings],
+                                          [f.get("severity") for f in findings])
+
+
+def estimate_block_runtime_columns(rule_ids: Sequence[str], severities: Sequence[str]) -> float:
+    """
+    Same as estimate_block_runtime, taking the parallel rule id / severity
+    columns (e.g. RuleEngine.findings_rid / findings_sev) directly.
+    """
+    rids = _ordinals(rule_ids, _RID_TO_IDX)
+    sevs = _ordinals(severities, _SEV_TO_IDX)
 
     # baseline per-file overhead
-    sec += 0.0001
-
-    for f in findings:
-        rid = f.get("rule_id")
-        sev = f.get("severity")
-        # severity weight to scale impact
-        weight = {"low": 0.5, "medium": 1.0, "high": 2.0}.get(sev, 1.0)
-
-        # heuristic impacts per rule id (very approximate)
-        if rid == "R001":  # nested loops
-            # assume nested loop over DEFAULT_LIST_SIZE -> O(n^2)
-            impact = BASE_OP_COST * (DEFAULT_LIST_SIZE ** 2) * weight
-        elif rid == "R002":  # expensive call in loop
-            impact = BASE_OP_COST * DEFAULT_LIST_SIZE * 10.0 * weight
-        elif rid == "R003":  # membership-in-list
-            impact = BASE_OP_COST * DEFAULT_LIST_SIZE * 2.0 * weight
-        elif rid == "R004":  # string concat in loop
-            impact = BASE_OP_COST * DEFAULT_LIST_SIZE * 1.5 * weight
-        elif rid == "R005":  # file I/O in loop
-            # I/O is heavier — assume 0.0005s per op
-            impact = 0.0005 * DEFAULT_LIST_SIZE * weight
-        elif rid == "R006":  # unused imports
-            impact = 0.00001 * weight
-        else:
-            impact = BASE_OP_COST * DEFAULT_LIST_SIZE * weight
-
-        sec += impact
+    sec = 0.0001 + float(np.dot(_IMPACT_TABLE[rids], _WEIGHT_TABLE[sevs]))
 
     # clamp minimum
     if sec < 1e-6:
@@ -55,15 +72,15 @@ def complexity_score(findings: List[Dict[str, Any]]) -> float:
     Return a 0..100 complexity-ish score (higher = worse).
     Simple mapping: more & higher severity findings => higher complexity.
     """
-    score = 0.0
-    for f in findings:
-        sev = f.get("severity")
-        if sev == "low":
-            score += 3
-        elif sev == "medium":
-            score += 8
-        elif sev == "high":
-            score += 18
+    return complexity_score_columns([f.get("severity") for f in findings])
+
+
+def complexity_score_columns(severities: Sequence[str]) -> float:
+    """
+    Same as complexity_score, taking the severity column directly.
+    """
+    sevs = _ordinals(severities, _SEV_TO_IDX)
+    score = float(_POINTS_TABLE[sevs].sum())
     # normalize to 0..100
     if score > 100:
         score = 100.0
@@ -1,6 +1,46 @@
 # parser.py
 import ast
-from typing import List, Dict, Any
+import sys
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+# call names reported by get_file_io_calls()
+_FILE_IO_CALLS = frozenset({"open", "read", "write", "writelines"})
+
+
+@lru_cache(maxsize=128)
+def _parse_cached(source: str) -> ast.Module:
+    # keyed on the source text itself; repeated analyses of the same input
+    # (e.g. Streamlit re-runs) reuse the tree. Callers must not mutate it.
+    # `# type:` comments are not analyzed, so they are never tokenized, and
+    # the grammar is pinned to the running interpreter.
+    return ast.parse(source, type_comments=False, feature_version=sys.version_info[:2])
+
+
+def _fast_walk(tree: ast.AST) -> List[ast.AST]:
+    """
+    Breadth-first traversal in the same order as `ast.walk`. Expands `_fields`
+    inline instead of going through the `ast.walk`/`ast.iter_child_nodes`
+    generator pair, roughly halving the per-node overhead.
+    """
+    out = []
+    todo = deque([tree])
+    pop, push = todo.popleft, todo.append
+    AST = ast.AST
+    while todo:
+        node = pop()
+        out.append(node)
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, AST):
+                        push(item)
+            elif isinstance(value, AST):
+                push(value)
+    return out
+
 
 class CodeParser:
     def __init__(self, source: str):
@@ -8,37 +48,38 @@ class CodeParser:
         self.tree = None
         self.syntax_error = None
         self.lines = self.source.splitlines()
+        # snippets are requested per finding; strip each line only once
+        self._stripped = [ln.strip() for ln in self.lines]
+        self._by_type: Dict[type, List[ast.AST]] = {}
+        self._context: Optional["ContextVisitor"] = None
         try:
             # parse source into AST
-            self.tree = ast.parse(self.source)
+            self.tree = _parse_cached(self.source)
         except SyntaxError as e:
             # store syntax error string for the caller to show
             self.syntax_error = f"{e.msg} (line {e.lineno})"
+        else:
+            # bucket nodes by type once so getters don't re-walk the tree
+            for n in _fast_walk(self.tree):
+                self._by_type.setdefault(type(n), []).append(n)
+
+    def has_node(self, *types: type) -> bool:
+        return any(t in self._by_type for t in types)
 
     def get_functions(self) -> List[ast.FunctionDef]:
-        if self.tree is None:
-            return []
-        return [n for n in ast.walk(self.tree) if isinstance(n, ast.FunctionDef)]
+        return self._by_type.get(ast.FunctionDef, [])
 
     def get_for_loops(self) -> List[ast.For]:
-        if self.tree is None:
-            return []
-        return [n for n in ast.walk(self.tree) if isinstance(n, ast.For)]
+        return self._by_type.get(ast.For, [])
 
     def get_while_loops(self) -> List[ast.While]:
-        if self.tree is None:
-            return []
-        return [n for n in ast.walk(self.tree) if isinstance(n, ast.While)]
+        return self._by_type.get(ast.While, [])
 
     def get_calls(self) -> List[ast.Call]:
-        if self.tree is None:
-            return []
-        return [n for n in ast.walk(self.tree) if isinstance(n, ast.Call)]
+        return self._by_type.get(ast.Call, [])
 
     def get_imports(self) -> List[Any]:
-        if self.tree is None:
-            return []
-        return [n for n in ast.walk(self.tree) if isinstance(n, (ast.Import, ast.ImportFrom))]
+        return self._by_type.get(ast.Import, []) + self._by_type.get(ast.ImportFrom, [])
 
     def _get_call_name(self, call: ast.Call) -> str:
         if isinstance(call.func, ast.Name):
@@ -49,31 +90,91 @@ class CodeParser:
 
     def _get_line(self, node: ast.AST) -> str:
         ln = getattr(node, "lineno", None)
-        if ln and 1 <= ln <= len(self.lines):
-            return self.lines[ln - 1].strip()
+        if ln and 1 <= ln <= len(self._stripped):
+            return self._stripped[ln - 1]
         return ""
 
+    def visit(self, visitor: "ContextVisitor") -> "ContextVisitor":
+        """
+        Run `visitor` over the tree and keep it as the source of context
+        nodes / file I/O calls, so rule passes built on ContextVisitor
+        produce those lists as a side effect of their own traversal.
+        """
+        if self.tree is not None:
+            visitor.visit(self.tree)
+        self._context = visitor
+        return visitor
+
+    def _ensure_visited(self) -> "ContextVisitor":
+        if self._context is None:
+            self.visit(ContextVisitor(self))
+        return self._context
+
     def get_file_io_calls(self) -> List[Dict[str, Any]]:
-        hits = []
-        if self.tree is None:
-            return hits
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Call):
-                name = self._get_call_name(node)
-                if name in ("open", "read", "write", "writelines"):
-                    hits.append({"lineno": getattr(node, "lineno", None), "snippet": self._get_line(node)})
-        return hits
+        return self._ensure_visited().io_calls
 
     def get_all_nodes_with_context(self) -> List[Dict[str, Any]]:
-        nodes = []
-        if self.tree is None:
-            return nodes
-        for n in ast.walk(self.tree):
-            if isinstance(n, (ast.For, ast.While, ast.FunctionDef, ast.Call, ast.Import, ast.ImportFrom)):
-                nodes.append({
-                    "type": type(n).__name__,
-                    "lineno": getattr(n, "lineno", None),
-                    "col_offset": getattr(n, "col_offset", None),
-                    "snippet": self._get_line(n)
-                })
-        return nodes
+        return self._ensure_visited().context_nodes
+
+
+class ContextVisitor:
+    """
+    Collects `CodeParser` context nodes and file I/O calls in a single pass.
+    The tree is walked depth-first in source order with an explicit stack, so
+    deeply nested input (long `elif` chains, `a + b + ...`) can't exhaust the
+    Python call stack. `visit_<Node>` hooks run before a node's children and
+    `leave_<Node>` hooks, if defined, after them; hooks must not recurse.
+    Subclasses extending the visit_* methods must call super() to keep them.
+    """
+    def __init__(self, parser: CodeParser):
+        self.parser = parser
+        self.context_nodes: List[Dict[str, Any]] = []
+        self.io_calls: List[Dict[str, Any]] = []
+
+    def visit(self, tree: ast.AST):
+        hooks: Dict[type, tuple] = {}
+        stack = [tree]
+        push, pop = stack.append, stack.pop
+        AST = ast.AST
+        while stack:
+            node = pop()
+            if type(node) is tuple:
+                # exit marker pushed below the node's children
+                node[0](node[1])
+                continue
+            cls = type(node)
+            hook = hooks.get(cls)
+            if hook is None:
+                name = cls.__name__
+                hook = hooks[cls] = (getattr(self, "visit_" + name, None), getattr(self, "leave_" + name, None))
+            enter, leave = hook
+            if enter is not None:
+                enter(node)
+            if leave is not None:
+                push((leave, node))
+            # push children last-first so they are popped in source order
+            for field in reversed(node._fields):
+                value = getattr(node, field, None)
+                if isinstance(value, list):
+                    for item in reversed(value):
+                        if isinstance(item, AST):
+                            push(item)
+                elif isinstance(value, AST):
+                    push(value)
+
+    def _add_context(self, n: ast.AST):
+        self.context_nodes.append({
+            "type": type(n).__name__,
+            "lineno": getattr(n, "lineno", None),
+            "col_offset": getattr(n, "col_offset", None),
+            "snippet": self.parser._get_line(n)
+        })
+
+    visit_For = visit_While = visit_FunctionDef = _add_context
+    visit_Import = visit_ImportFrom = _add_context
+
+    def visit_Call(self, node: ast.Call):
+        name = self.parser._get_call_name(node)
+        if name in _FILE_IO_CALLS:
+            self.io_calls.append({"lineno": getattr(node, "lineno", None), "snippet": self.parser._get_line(node)})
+        self._add_context(node)
@@ -1,136 +1,157 @@
 # rules.py
 import ast
-from typing import List, Dict, Any
-from parser import CodeParser
-
-class RuleFinding:
-    def __init__(self, rule_id: str, severity: str, lineno: int, snippet: str, message: str, suggestion: str):
-        self.rule_id = rule_id
-        self.severity = severity
-        self.lineno = lineno
-        self.snippet = snippet
-        self.message = message
-        self.suggestion = suggestion
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "rule_id": self.rule_id,
-            "severity": self.severity,
-            "lineno": self.lineno,
-            "snippet": self.snippet,
-            "message": self.message,
-            "suggestion": self.suggestion,
-        }
+from array import array
+from typing import List, Dict, Any, Optional
+from parser import CodeParser, ContextVisitor
+
+# calls that are not worth flagging inside loops (R002)
+_CHEAP_CALLS = frozenset({"len", "range", "enumerate", "sum", "map", "filter"})
+# calls treated as file I/O inside loops (R005)
+_IO_CALLS = frozenset({"open", "write", "writelines"})
+
+# (message, suggestion) per finding kind; `{0}` is filled from the finding's args
+_MSG = {
+    "SYNTAX_ERROR": ("Invalid Python syntax detected.",
+                     "Please fix syntax errors before analysis."),
+    "R001": ("Nested loop detected; may indicate O(n^2) complexity.",
+             "Consider using hashing (set/dict) or rethinking algorithm to avoid nested iteration."),
+    "R002": ("Function call `{0}` inside loop may be expensive.",
+             "Move `{0}` outside loop if possible, or memoize its result."),
+    "R003": ("Membership test on a list is O(n); consider using a set for faster lookups.",
+             "Convert the container to a set if membership checks are frequent: `s = set(mylist)`."),
+    "R004": ("String concatenation inside loop may be inefficient; use join or StringIO.",
+             "Collect strings and use `''.join(list_of_parts)` or `io.StringIO`."),
+    "R005": ("File I/O inside loop detected. This can be slow and energy-intensive.",
+             "Open files once outside the loop and buffer writes."),
+    "R006": ("Import `{0}` appears unused.",
+             "Remove unused imports to reduce code bloat."),
+    "R006_FROM": ("Import from `{0}` appears unused.",
+                  "Remove unused imports to reduce code bloat."),
+}
+
+class FusedVisitor(ContextVisitor):
+    """
+    Single-pass visitor emitting findings for R001-R006. Tracks the stack of
+    enclosing `for` loops so in-loop rules don't need to re-walk each loop body.
+    Context nodes and file I/O calls for the parser are collected on the way.
+    """
+    def __init__(self, parser: CodeParser, engine: "RuleEngine"):
+        super().__init__(parser)
+        self._add_finding = engine._add_finding
+        self._for_stack: List[ast.For] = []
+        self._imports: List[Any] = []
+        self._used_names = set()
+
+    def _emit(self, rule_id: str, severity: str, node: ast.AST, *args: str, msg_key: Optional[str] = None):
+        self._add_finding(rule_id, severity, getattr(node, "lineno", None), self.parser._get_line(node),
+                          msg_key or rule_id, args)
+
+    def visit_For(self, node: ast.For):
+        if self._for_stack:
+            # report against the enclosing loop, once per nested loop
+            self._emit("R001", "high", self._for_stack[-1])
+        self._for_stack.append(node)
+        super().visit_For(node)
+
+    def leave_For(self, node: ast.For):
+        self._for_stack.pop()
+
+    def visit_Call(self, node: ast.Call):
+        if self._for_stack:
+            name = self.parser._get_call_name(node)
+            if name and name not in _CHEAP_CALLS:
+                self._emit("R002", "medium", node, name)
+            if name in _IO_CALLS:
+                self._emit("R005", "high", node)
+        super().visit_Call(node)
+
+    def visit_BinOp(self, node: ast.BinOp):
+        if self._for_stack and isinstance(node.op, ast.Add):
+            self._emit("R004", "low", node)
+
+    def visit_If(self, node: ast.If):
+        test = node.test
+        if isinstance(test, ast.Compare):
+            for op in test.ops:
+                if isinstance(op, ast.In):
+                    self._emit("R003", "medium", node)
+
+    def visit_Name(self, node: ast.Name):
+        self._used_names.add(node.id)
+
+    def visit_Import(self, node: ast.Import):
+        self._imports.append(node)
+        super().visit_Import(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self._imports.append(node)
+        super().visit_ImportFrom(node)
+
+    def finish(self):
+        # R006: diff imported names against names used anywhere in the tree
+        used_names = self._used_names
+        for imp in self._imports:
+            if isinstance(imp, ast.Import):
+                for name in imp.names:
+                    nm = name.asname or name.name.split('.')[0]
+                    if nm not in used_names:
+                        self._emit("R006", "low", imp, nm)
+            else:
+                module = imp.module or ""
+                for name in imp.names:
+                    nm = name.asname or name.name
+                    if nm not in used_names:
+                        self._emit("R006", "low", imp, module, msg_key="R006_FROM")
 
 class RuleEngine:
     def __init__(self, source: str):
         self.parser = CodeParser(source)
-        self.findings: List[RuleFinding] = []
+        # Findings are stored as parallel columns (struct-of-arrays) so the
+        # estimator can consume rule ids / severities directly. Line 0 means
+        # "no line"; findings_ctx holds (snippet, _MSG key, format args).
+        # get_findings() builds the dict view with formatted text on demand.
+        self.findings_rid: List[str] = []
+        self.findings_sev: List[str] = []
+        self.findings_ln = array("i")
+        self.findings_ctx: List[tuple] = []
+        self._finding_dicts: Optional[List[Dict[str, Any]]] = None
         # If parser found a syntax error, populate findings and stop
         if self.parser.syntax_error:
-            self.findings.append(RuleFinding(
-                "SYNTAX_ERROR",
-                "high",
-                None,
-                self.parser.syntax_error,
-                "Invalid Python syntax detected.",
-                "Please fix syntax errors before analysis."
-            ))
+            self._add_finding("SYNTAX_ERROR", "high", None, self.parser.syntax_error, "SYNTAX_ERROR", ())
         else:
             self._run_all()
 
     def _run_all(self):
-        self._rule_nested_loops()
-        self._rule_expensive_call_in_loop()
-        self._rule_membership_in_list()
-        self._rule_string_concat_in_loop()
-        self._rule_file_io_in_loop()
-        self._rule_unused_imports()
-
-    def _rule_nested_loops(self):
-        for for_node in self.parser.get_for_loops():
-            for child in ast.walk(for_node):
-                if child is not for_node and isinstance(child, ast.For):
-                    lineno = getattr(for_node, "lineno", None)
-                    snippet = self.parser._get_line(for_node)
-                    msg = "Nested loop detected; may indicate O(n^2) complexity."
-                    suggestion = "Consider using hashing (set/dict) or rethinking algorithm to avoid nested iteration."
-                    self.findings.append(RuleFinding("R001", "high", lineno, snippet, msg, suggestion))
-
-    def _rule_expensive_call_in_loop(self):
-        for for_node in self.parser.get_for_loops():
-            calls = [n for n in ast.walk(for_node) if isinstance(n, ast.Call)]
-            for c in calls:
-                name = self.parser._get_call_name(c)
-                if name and name not in ("len", "range", "enumerate", "sum", "map", "filter"):
-                    lineno = getattr(c, "lineno", None)
-                    snippet = self.parser._get_line(c)
-                    msg = f"Function call `{name}` inside loop may be expensive."
-                    suggestion = f"Move `{name}` outside loop if possible, or memoize its result."
-                    self.findings.append(RuleFinding("R002", "medium", lineno, snippet, msg, suggestion))
-
-    def _rule_membership_in_list(self):
-        if self.parser.tree is None:
-            return
-        for node in ast.walk(self.parser.tree):
-            if isinstance(node, ast.If):
-                test = node.test
-                if isinstance(test, ast.Compare):
-                    for op in test.ops:
-                        if isinstance(op, ast.In):
-                            lineno = getattr(node, "lineno", None)
-                            snippet = self.parser._get_line(node)
-                            msg = "Membership test on a list is O(n); consider using a set for faster lookups."
-                            suggestion = "Convert the container to a set if membership checks are frequent: `s = set(mylist)`."
-                            self.findings.append(RuleFinding("R003", "medium", lineno, snippet, msg, suggestion))
-
-    def _rule_string_concat_in_loop(self):
-        for for_node in self.parser.get_for_loops():
-            for child in ast.walk(for_node):
-                if isinstance(child, ast.BinOp) and isinstance(child.op, ast.Add):
-                    lineno = getattr(child, "lineno", None)
-                    snippet = self.parser._get_line(child)
-                    msg = "String concatenation inside loop may be inefficient; use join or StringIO."
-                    suggestion = "Collect strings and use `''.join(list_of_parts)` or `io.StringIO`."
-                    self.findings.append(RuleFinding("R004", "low", lineno, snippet, msg, suggestion))
-
-    def _rule_file_io_in_loop(self):
-        for for_node in self.parser.get_for_loops():
-            for child in ast.walk(for_node):
-                if isinstance(child, ast.Call):
-                    name = self.parser._get_call_name(child)
-                    if name in ("open", "write", "writelines"):
-                        lineno = getattr(child, "lineno", None)
-                        snippet = self.parser._get_line(child)
-                        msg = "File I/O inside loop detected. This can be slow and energy-intensive."
-                        suggestion = "Open files once outside the loop and buffer writes."
-                        self.findings.append(RuleFinding("R005", "high", lineno, snippet, msg, suggestion))
-
-    def _rule_unused_imports(self):
-        imports = self.parser.get_imports()
-        if not imports:
+        # every rule needs a for-loop, an `if` test or an import to fire;
+        # skip the traversal entirely for sources (e.g. small snippets) with none
+        if not self.parser.has_node(ast.For, ast.If, ast.Import, ast.ImportFrom):
             return
-        used_names = {n.id for n in ast.walk(self.parser.tree) if isinstance(n, ast.Name)}
-        for imp in imports:
-            if isinstance(imp, ast.Import):
-                for name in imp.names:
-                    nm = name.asname or name.name.split('.')[0]
-                    if nm not in used_names:
-                        lineno = getattr(imp, "lineno", None)
-                        snippet = self.parser._get_line(imp)
-                        msg = f"Import `{nm}` appears unused."
-                        suggestion = "Remove unused imports to reduce code bloat."
-                        self.findings.append(RuleFinding("R006", "low", lineno, snippet, msg, suggestion))
-            elif isinstance(imp, ast.ImportFrom):
-                module = imp.module or ""
-                for name in imp.names:
-                    nm = name.asname or name.name
-                    if nm not in used_names:
-                        lineno = getattr(imp, "lineno", None)
-                        snippet = self.parser._get_line(imp)
-                        msg = f"Import from `{module}` appears unused."
-                        suggestion = "Remove unused imports to reduce code bloat."
-                        self.findings.append(RuleFinding("R006", "low", lineno, snippet, msg, suggestion))
+        visitor = self.parser.visit(FusedVisitor(self.parser, self))
+        visitor.finish()
+
+    def _add_finding(self, rule_id: str, severity: str, lineno: Optional[int], snippet: str,
+                     msg_key: str, args: tuple):
+        self.findings_rid.append(rule_id)
+        self.findings_sev.append(severity)
+        self.findings_ln.append(lineno or 0)
+        self.findings_ctx.append((snippet, msg_key, args))
 
     def get_findings(self) -> List[Dict[str, Any]]:
-        return [f.to_dict() for f in self.findings]
+        if self._finding_dicts is None:
+            out = []
+            for rule_id, severity, lineno, (snippet, msg_key, args) in zip(
+                    self.findings_rid, self.findings_sev, self.findings_ln, self.findings_ctx):
+                message, suggestion = _MSG[msg_key]
+                if args:
+                    message = message.format(*args)
+                    suggestion = suggestion.format(*args)
+                out.append({
+                    "rule_id": rule_id,
+                    "severity": severity,
+                    "lineno": lineno or None,
+                    "snippet": snippet,
+                    "message": message,
+                    "suggestion": suggestion,
+                })
+            self._finding_dicts = out
+        return self._finding_dicts
@@ -1,35 +1,55 @@
 # streamlit_app.py
 import streamlit as st
-from rules import RuleEngine
-from estimator import estimate_block_runtime, complexity_score
+import cache
 from carbon import estimate_energy_and_co2
-from suggester import generate_suggestions, naive_apply_patch
+from suggester import analyze
 import base64
+import bisect
+
+# grade boundaries: score >= _GRADE_THRESHOLDS[i] earns _GRADES[i + 1]
+_GRADES = ("F", "D", "C", "B", "A", "A+")
+_GRADE_THRESHOLDS = (50, 60, 70, 80, 90)
 
 # -----------------------------
 # Human-readable impact helpers
 # -----------------------------
 
+def grade_for(score):
+    return _GRADES[bisect.bisect_right(_GRADE_THRESHOLDS, score)]
+
+
+# impact bands: a value below _BINS[i] (and not below _BINS[i - 1]) maps to _MSGS[i]
+_KWH_BINS = (0.005, 0.02, 0.1)
+_KWH_MSGS = (
+    "Less than charging a smartphone for a few minutes",
+    "Equivalent to running a laptop for about 20 minutes",
+    "Equivalent to charging a smartphone once",
+    "Equivalent to running an LED bulb for several hours",
+)
+_CO2_BINS = (1, 10, 50)
+_CO2_MSGS = (
+    "Comparable to keeping a small LED bulb ON for a few minutes",
+    "Comparable to keeping a light ON for about 1 hour",
+    "Comparable to driving a petrol car for a short distance",
+    "Comparable to multiple everyday household activities",
+)
+
+
 def energy_to_human(kwh):
-    if kwh < 0.005:
-        return "Less than charging a smartphone for a few minutes"
-    elif kwh < 0.02:
-        return "Equivalent to running a laptop for about 20 minutes"
-    elif kwh < 0.1:
-        return "Equivalent to charging a smartphone once"
-    else:
-        return "Equivalent to running an LED bulb for several hours"
+    return _KWH_MSGS[bisect.bisect_right(_KWH_BINS, kwh)]
 
 
 def co2_to_human(co2_g):
-    if co2_g < 1:
-        return "Comparable to keeping a small LED bulb ON for a few minutes"
-    elif co2_g < 10:
-        return "Comparable to keeping a light ON for about 1 hour"
-    elif co2_g < 50:
-        return "Comparable to driving a petrol car for a short distance"
-    else:
-        return "Comparable to multiple everyday household activities"
+    return _CO2_MSGS[bisect.bisect_right(_CO2_BINS, co2_g)]
+
+
+@st.cache_data(show_spinner=False, max_entries=cache.CACHE_MAX_ENTRIES, ttl=cache.CACHE_MAX_AGE)
+def _analyze_code(source_code):
+    # Everything derived from the source alone. Cached on the source text so
+    # re-runs (sidebar tweaks, repeated clicks) skip parsing and rule evaluation;
+    # analyze() additionally caches on disk across sessions. Entries hold users'
+    # code, so they are bounded like the disk cache.
+    return analyze(source_code)
 
 
 st.set_page_config(page_title="Digital Waste Analyzer", layout="wide")
@@ -63,14 +83,14 @@ if source_code is None:
 
 # Run analysis when user clicks
 if st.button("Analyze"):
-    # create engine and get findings
+    # run (or fetch cached) analysis
     try:
-        engine = RuleEngine(source_code)
-        findings = engine.get_findings()
+        result = _analyze_code(source_code)
     except Exception as e:
         st.error("An unexpected error occurred during analysis.")
         st.write("Error:", str(e))
         st.stop()
+    findings = result["findings"]
 
     # Safety: if parser reported syntax error, show friendly message
     if findings and findings[0].get("rule_id") == "SYNTAX_ERROR":
@@ -78,26 +98,15 @@ if st.button("Analyze"):
         st.code(findings[0].get("snippet", "Syntax error"))
         st.stop()
 
-    # proceed with estimator and suggestions
-    est_seconds = estimate_block_runtime(findings)
-    complexity = complexity_score(findings)
+    # carbon math is cheap, so sidebar assumptions are applied outside the cache
+    est_seconds = result["est_seconds"]
+    complexity = result["complexity"]
     energy = estimate_energy_and_co2(est_seconds, cpu_watts=cpu_watts, carbon_intensity_g_per_kwh=carbon_intensity)
 
     base = 100.0
     penalty = complexity
     final_score = max(0, base - penalty)
-    if final_score >= 90:
-        grade = "A+"
-    elif final_score >= 80:
-        grade = "A"
-    elif final_score >= 70:
-        grade = "B"
-    elif final_score >= 60:
-        grade = "C"
-    elif final_score >= 50:
-        grade = "D"
-    else:
-        grade = "F"
+    grade = grade_for(final_score)
 
     st.metric("Code Carbon Grade", grade)
     st.write(f"Estimated runtime per run: **{est_seconds:.6f} s**")
@@ -121,16 +130,16 @@ if st.button("Analyze"):
 
     st.write("---")
     st.write("**Suggestions (templated)**")
-    suggs = generate_suggestions(findings)
+    suggs = result["suggs"]
     if not suggs:
         st.info("No template suggestions available.")
     else:
         for s in suggs:
-            st.markdown(f"**{s['rule_id']} — {s['title']}**")
-            st.code(s['suggestion'])
+            st.markdown(f"**{s.rule_id} — {s.title}**")
+            st.code(s.suggestion)
             st.write("---")
 
-    patched = naive_apply_patch(source_code, findings)
+    patched = result["patched"]
     st.write("**Optimized (naive) file**")
     st.code(patched, language="python")
 
@@ -1,6 +1,14 @@
 # suggester.py
-# Small templated suggestion engine + naive patcher (text-based)
-from typing import List, Dict
+# Small templated suggestion engine + naive patcher (text-based) + cached analysis entry point
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Union
+
+import cache
+from estimator import estimate_block_runtime_columns, complexity_score_columns
+from parser import CodeParser
+from rules import RuleEngine
 
 
 TEMPLATED_SNIPPETS = {
@@ -34,57 +42,209 @@ TEMPLATED_SNIPPETS = {
 }
 
 
-def generate_suggestions(findings: List[Dict]) -> List[Dict]:
+# TEMPLATED_SNIPPETS flattened into parallel tuples indexed by rule ordinal,
+# built once at import
+_RID_TO_IDX = {rid: i for i, rid in enumerate(TEMPLATED_SNIPPETS)}
+_TITLES = tuple(info["title"] for info in TEMPLATED_SNIPPETS.values())
+_SUGGESTIONS = tuple(info["suggestion"] for info in TEMPLATED_SNIPPETS.values())
+# one bit per templated rule for tracking which rules were already emitted
+_RID_TO_BIT = {rid: 1 << i for rid, i in _RID_TO_IDX.items()}
+_ALL_SEEN = (1 << len(_RID_TO_IDX)) - 1
+
+
+@dataclass(slots=True, frozen=True)
+class Suggestion:
+    rule_id: str
+    lineno: Optional[int]
+    title: str
+    suggestion: str
+    message: Optional[str]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def generate_suggestions(findings: List[Dict]) -> List[Suggestion]:
     """
-    Map each finding to a suggestion template. Returns list of dicts with
-    rule_id, title, suggestion, lineno.
+    Map each finding to a suggestion template. Returns one Suggestion
+    (rule_id, lineno, title, suggestion, message) per templated rule found.
+    Findings must carry rule_id, lineno and message keys, as produced by
+    RuleEngine.get_findings(); a missing key raises KeyError.
     """
     out = []
-    seen = set()
+    seen_mask = 0
+    rule_bit = _RID_TO_BIT.get
     for f in findings:
-        rid = f.get("rule_id")
-        if rid in TEMPLATED_SNIPPETS and rid not in seen:
-            info = TEMPLATED_SNIPPETS[rid]
-            out.append({
-                "rule_id": rid,
-                "lineno": f.get("lineno"),
-                "title": info["title"],
-                "suggestion": info["suggestion"],
-                "message": f.get("message"),
-            })
-            seen.add(rid)
+        rid = f["rule_id"]
+        bit = rule_bit(rid)
+        if bit is None or seen_mask & bit:
+            continue
+        idx = _RID_TO_IDX[rid]
+        out.append(Suggestion(rid, f["lineno"], _TITLES[idx], _SUGGESTIONS[idx], f["message"]))
+        seen_mask |= bit
+        # only the first finding per rule is used; stop once every rule is covered
+        if seen_mask == _ALL_SEEN:
+            break
     return out
 
 
-def naive_apply_patch(source: str, findings: List[Dict]) -> str:
+# comment inserted above the offending line by naive_apply_patch, per rule id
+PATCH_COMMENTS = {
+    # membership-in-list -> convert to set
+    "R003": "# SUGGESTION: Convert container to set for faster membership checks",
+    # string concat in loop -> join suggestion
+    "R004": "# SUGGESTION: Consider collecting strings and using ''.join(list_of_parts)",
+    # file I/O in loop -> open file outside loop
+    "R005": "# SUGGESTION: Open file outside the loop and buffer writes",
+}
+
+
+def naive_apply_patch(source: Union[str, CodeParser], findings: List[Dict]) -> str:
     """
     Very naive text-based patcher: applies simple transformations for a few rules.
     This is intentionally conservative and only performs textbook replacements:
       - string concatenation in loops -> join pattern (best-effort)
       - membership-in-list -> add comment recommending set
-    It returns a new source string. For safety, it never removes code automatically.
+    It returns a new source string (the input unchanged if no finding applies).
+    For safety, it never removes code automatically.
+    `source` may be the CodeParser the findings came from (e.g. `engine.parser`).
+    Line endings are kept as in the input; each comment takes the ending of
+    the line it precedes, as in naive_apply_patch_stream.
     """
-    lines = source.splitlines()
-    out_lines = lines.copy()
+    # bucket comments by original line index, then rebuild the output in one
+    # pass; indexes past the last line are simply never reached
+    inserts: Dict[int, List[str]] = {}
+    for f in findings:
+        comment = PATCH_COMMENTS.get(f.get("rule_id"))
+        ln = f.get("lineno")
+        if comment is None or not ln or ln < 1:
+            continue
+        inserts.setdefault(ln - 1, []).append(comment)
+
+    if not inserts:
+        # nothing to annotate (e.g. only R001/R002/R006 findings): return the
+        # input as-is rather than splitting and re-joining it
+        return source.source if isinstance(source, CodeParser) else source
 
+    text = source.source if isinstance(source, CodeParser) else source
+    out = []
+    for i, line in enumerate(text.splitlines(keepends=True)):
+        if i in inserts:
+            # a last line without an ending still gets a newline after the comment
+            eol = line[len(line.rstrip("\r\n")):] or "\n"
+            out.extend(comment + eol for comment in inserts[i])
+        out.append(line)
+    return "".join(out)
+
+
+def naive_apply_patch_stream(source_iter: Iterable[str], findings: List[Dict]) -> Iterator[str]:
+    """
+    Streaming variant of naive_apply_patch for sources that shouldn't be held
+    in memory. `source_iter` yields lines with their line endings (e.g. an open
+    file); patched lines are yielded in order, ready for `writelines`. Each
+    comment takes the line ending of the line it precedes, so the joined output
+    equals naive_apply_patch's.
+    """
+    patchable = []
     for f in findings:
-        rid = f.get("rule_id")
+        comment = PATCH_COMMENTS.get(f.get("rule_id"))
         ln = f.get("lineno")
-        if not ln:
+        if comment is not None and ln and ln >= 1:
+            patchable.append((ln, comment))
+    # sort is stable, so comments for the same line keep finding order
+    patchable.sort(key=lambda p: p[0])
+    fi, n = 0, len(patchable)
+    for lineno, line in enumerate(source_iter, start=1):
+        if fi < n and patchable[fi][0] == lineno:
+            # a last line without an ending still gets a newline after the comment
+            eol = line[len(line.rstrip("\r\n")):] or "\n"
+            while fi < n and patchable[fi][0] == lineno:
+                yield patchable[fi][1] + eol
+                fi += 1
+        yield line
+
+
+def analyze(source: str) -> Dict[str, Any]:
+    """
+    Run the full pipeline on `source`: findings, runtime/complexity estimates,
+    templated suggestions and the naive patch. Results are cached on disk by
+    source hash (see cache.py), so unchanged input does no rule work on later
+    runs. Sources with syntax errors return only their findings and are not cached.
+    """
+    key = cache.key_for(source)
+    cached = cache.load(key)
+    if cached is not None:
+        return cached
+    result = _analyze_uncached(source)
+    if "patched" in result:
+        cache.store(key, result)
+    return result
+
+
+def _analyze_uncached(source: str) -> Dict[str, Any]:
+    engine = RuleEngine(source)
+    findings = engine.get_findings()
+    if findings and findings[0].get("rule_id") == "SYNTAX_ERROR":
+        return {"findings": findings}
+    return {
+        "findings": findings,
+        "est_seconds": estimate_block_runtime_columns(engine.findings_rid, engine.findings_sev),
+        "complexity": complexity_score_columns(engine.findings_sev),
+        "suggs": generate_suggestions(findings),
+        "patched": naive_apply_patch(engine.parser, findings),
+    }
+
+
+def _read_source(path: str) -> str:
+    with open(path, "rb") as fh:
+        data = fh.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _batch_chunksize(n: int, chunksize: int, workers: int) -> int:
+    # executor.map submits each chunk as one task, so cap the chunk size to
+    # give every worker at least one chunk on small batches
+    return max(1, min(chunksize, n // workers))
+
+
+def run_batch(paths: List[str], chunksize: int = 32) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze many files, returning {path: analyze() result}. Cache hits are
+    resolved in this process; only misses are dispatched, in chunks, to a
+    process pool (analysis is pure, so files are independent), and their
+    results are stored in the cache here. Paths that can't be read map to
+    {"error": message} instead of aborting the batch.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    pending_paths, pending_keys, pending_sources = [], [], []
+    for path in paths:
+        try:
+            source = _read_source(path)
+        except OSError as e:
+            results[path] = {"error": f"Could not read {path}: {e.strerror or e}"}
             continue
-        idx = ln - 1
-        # R003: membership-in-list -> add comment to convert to set
-        if rid == "R003":
-            # insert a comment above the line
-            if 0 <= idx < len(out_lines):
-                out_lines.insert(idx, "# SUGGESTION: Convert container to set for faster membership checks")
-        # R004: string concat in loop -> add comment with join suggestion
-        if rid == "R004":
-            if 0 <= idx < len(out_lines):
-                out_lines.insert(idx, "# SUGGESTION: Consider collecting strings and using ''.join(list_of_parts)")
-        # R005: file I/O in loop -> suggest opening file outside loop
-        if rid == "R005":
-            if 0 <= idx < len(out_lines):
-                out_lines.insert(idx, "# SUGGESTION: Open file outside the loop and buffer writes")
-
-    return "\n".join(out_lines)
+        key = cache.key_for(source)
+        cached = cache.load(key)
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending_paths.append(path)
+            pending_keys.append(key)
+            pending_sources.append(source)
+
+    if len(pending_sources) == 1:
+        computed = [_analyze_uncached(pending_sources[0])]
+    elif pending_sources:
+        size = _batch_chunksize(len(pending_sources), chunksize, os.cpu_count() or 1)
+        with ProcessPoolExecutor() as executor:
+            computed = list(executor.map(_analyze_uncached, pending_sources, chunksize=size))
+    else:
+        computed = []
+    for path, key, result in zip(pending_paths, pending_keys, computed):
+        if "patched" in result:
+            cache.store(key, result)
+        results[path] = result
+    return results
@@ -1,4 +1,6 @@
+from parser import CodeParser
 from rules import RuleEngine
+from suggester import naive_apply_patch, naive_apply_patch_stream, PATCH_COMMENTS
 
 code = """
 import os
@@ -10,3 +12,68 @@ for i in range(10):
 engine = RuleEngine(code)
 for f in engine.get_findings():
     print(f)
+
+# patch comments must sit above the originally numbered lines, not drift down
+# as earlier comments are inserted
+patched = naive_apply_patch("a\nb\nc\nd\ne", [
+    {"rule_id": "R003", "lineno": 3},
+    {"rule_id": "R004", "lineno": 5},
+])
+print(patched)
+assert patched.splitlines() == [
+    "a", "b", PATCH_COMMENTS["R003"], "c", "d", PATCH_COMMENTS["R004"], "e",
+]
+# the trailing newline survives whether or not a comment was inserted
+assert naive_apply_patch("a\n", []) == naive_apply_patch("a\n", [{"rule_id": "R003", "lineno": 9}]) == "a\n"
+
+# the streaming patcher must match naive_apply_patch, with or without a final
+# newline, and both must keep CRLF input free of mixed line endings
+stream_findings = [{"rule_id": "R005", "lineno": 2}, {"rule_id": "R003", "lineno": 3}]
+for src in ("a\nf = open('f')\nb", "a\nf = open('f')\nb\n", "a\r\nf = open('f')\r\nb\r\n"):
+    streamed = "".join(naive_apply_patch_stream(src.splitlines(keepends=True), stream_findings))
+    assert streamed == naive_apply_patch(src, stream_findings)
+crlf = "".join(naive_apply_patch_stream(["a\r\n", "f = open('f')\r\n", "b\r\n"], stream_findings))
+assert crlf.count("\n") == crlf.count("\r\n") == 5
+crlf = naive_apply_patch("x = []\r\nfor a in b:\r\n    s = s + a\r\n", [{"rule_id": "R004", "lineno": 3}])
+assert crlf.count("\n") == crlf.count("\r\n") == 4
+
+# deeply nested but valid input must not hit the recursion limit
+deep_concat = "for i in y:\n    x = " + " + ".join(["'a'"] * 2000)
+assert len(RuleEngine(deep_concat).get_findings()) == 1999
+deep_elif = "if a: pass\n" + "".join(f"elif a == {i}: pass\n" for i in range(350))
+assert RuleEngine(deep_elif).get_findings() == []
+
+# the standalone context pass (no rule engine) must be iterative as well
+deep_parser = CodeParser("if a: pass\n" + "".join(f"elif a == {i}: open(f)\n" for i in range(600)))
+assert len(deep_parser.get_all_nodes_with_context()) == 600
+assert len(deep_parser.get_file_io_calls()) == 600
+
+if __name__ == "__main__":
+    # batch smoke check; the pool needs the __main__ guard under spawn
+    import os
+    import tempfile
+    from pathlib import Path
+    import cache
+    from suggester import run_batch, _batch_chunksize
+
+    # small batches must still be split into at least one chunk per worker
+    for n in (2, 7, 20, 64, 100):
+        size = _batch_chunksize(n, 32, 8)
+        assert -(-n // size) >= min(n, 8)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache.CACHE_DIR = Path(tmp) / "cache"
+        paths = []
+        for i, src in enumerate([code, "for x in y:\n    s = s + x\n", "def (:\n"]):
+            paths.append(os.path.join(tmp, f"f{i}.py"))
+            with open(paths[-1], "w") as fh:
+                fh.write(src)
+        missing = os.path.join(tmp, "missing.py")
+        results = run_batch(paths + [missing])
+        assert results[paths[0]]["findings"] == engine.get_findings()
+        assert results[paths[1]]["findings"][0]["rule_id"] == "R004"
+        assert results[paths[2]]["findings"][0]["rule_id"] == "SYNTAX_ERROR"
+        assert "error" in results[missing]
+        # the two analyzable files were cached by the parent; a rerun hits the cache
+        assert len(list(cache.CACHE_DIR.glob("*.bin"))) == 2
+        assert run_batch(paths[:2]) == {p: results[p] for p in paths[:2]}